@@ -28,31 +28,47 @@ function initFirebase() {
     }
 }
 
+// Number of shard documents per system. Each quiz completion increments one
+// randomly chosen shard, so concurrent writes for a popular system are spread
+// across NUM_SHARDS documents instead of contending on one.
+// Must stay in sync with the shard bound in firestore.rules.
+const NUM_SHARDS = 10;
+
+// Maximum age of the cached leaderboard snapshot before pages fall back to
+// summing the live counters. scripts/aggregate_stats.py should be scheduled
+// to refresh the snapshot more often than this.
+const SNAPSHOT_MAX_AGE_MS = 60 * 60 * 1000;
+
+/**
+ * Convert a system name into the document ID used for its stats.
+ * @param {string} systemName - The name of the system (e.g., "Stoicism")
+ * @returns {string} Document ID (e.g., "stoicism")
+ */
+function getStatsDocId(systemName) {
+    return systemName.toLowerCase().replace(/\s+/g, '-');
+}
+
 /**
  * Increment the match count for a specific metaphysical system.
- * Uses a transaction to safely increment the counter.
+ * Writes to a random shard with an atomic server-side increment, so no
+ * read-modify-write transaction is needed.
  * @param {string} systemName - The name of the system (e.g., "Stoicism")
  */
 async function incrementSystemCount(systemName) {
     if (!initFirebase()) return;
 
-    // Use a clean ID for the document
-    const docId = systemName.toLowerCase().replace(/\s+/g, '-');
-    const docRef = db.collection('system_stats').doc(docId);
+    const docId = getStatsDocId(systemName);
+    const shard = Math.floor(Math.random() * NUM_SHARDS);
+    const shardRef = db.collection('system_stats_shards').doc(`${docId}_${shard}`);
 
     try {
-        await db.runTransaction(async (transaction) => {
-            const doc = await transaction.get(docRef);
-
-            if (!doc.exists) {
-                // Create if it doesn't exist
-                transaction.set(docRef, { name: systemName, count: 1 });
-            } else {
-                // Increment
-                const newCount = (doc.data().count || 0) + 1;
-                transaction.update(docRef, { count: newCount });
-            }
-        });
+        // merge: true creates the shard with count 1 on first use
+        await shardRef.set({
+            system: docId,
+            name: systemName,
+            shard: shard,
+            count: firebase.firestore.FieldValue.increment(1)
+        }, { merge: true });
         console.log(`Updated stats for ${systemName}`);
     } catch (error) {
         console.error("Error updating stats:", error);
@@ -60,22 +76,29 @@ async function incrementSystemCount(systemName) {
 }
 
 /**
- * Fetch counts for all systems.
- * @returns {Promise<Object>} Object mapping system names to counts, e.g. { "Stoicism": 10, "Idealism": 5 }
+ * Sum counts for all systems directly from Firestore.
+ * Combines the legacy single-document counters in system_stats with the
+ * sharded counters in system_stats_shards.
+ * @returns {Promise<Object>} Object mapping system names to counts
  */
-async function getSystemStats() {
+async function getLiveSystemStats() {
     if (!initFirebase()) return {};
 
     try {
-        const snapshot = await db.collection('system_stats').get();
+        const [legacySnapshot, shardSnapshot] = await Promise.all([
+            db.collection('system_stats').get(),
+            db.collection('system_stats_shards').get()
+        ]);
         const stats = {};
 
-        snapshot.forEach(doc => {
+        const addCount = doc => {
             const data = doc.data();
-            // Use the stored name for display, or capitalize the ID if name missing
-            const name = data.name || doc.id;
-            stats[name] = data.count || 0;
-        });
+            // Use the stored name for display, or the ID if name missing
+            const name = data.name || data.system || doc.id;
+            stats[name] = (stats[name] || 0) + (data.count || 0);
+        };
+        legacySnapshot.forEach(addCount);
+        shardSnapshot.forEach(addCount);
 
         return stats;
     } catch (error) {
@@ -84,7 +107,33 @@ async function getSystemStats() {
     }
 }
 
+/**
+ * Fetch counts for all systems.
+ * Reads the cached leaderboard snapshot written by scripts/aggregate_stats.py,
+ * falling back to summing the live counters if no snapshot exists or it is
+ * older than SNAPSHOT_MAX_AGE_MS.
+ * @returns {Promise<Object>} Object mapping system names to counts, e.g. { "Stoicism": 10, "Idealism": 5 }
+ */
+async function getSystemStats() {
+    if (!initFirebase()) return {};
+
+    try {
+        const snapshot = await db.collection('leaderboard_cache').doc('current').get();
+        if (snapshot.exists && snapshot.data().counts) {
+            const age = Date.now() - Date.parse(snapshot.data().updated_at);
+            if (age <= SNAPSHOT_MAX_AGE_MS) {
+                return { ...snapshot.data().counts };
+            }
+        }
+    } catch (error) {
+        console.warn("Could not load cached stats, using live counters:", error);
+    }
+
+    return getLiveSystemStats();
+}
+
 // Expose functions to global scope
 window.initFirebase = initFirebase;
 window.incrementSystemCount = incrementSystemCount;
 window.getSystemStats = getSystemStats;
+window.getLiveSystemStats = getLiveSystemStats;
@@ -0,0 +1,337 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Firestore layout (must match js/stats.js and firestore.rules)
+LEGACY_COLLECTION = "system_stats"
+SHARDS_COLLECTION = "system_stats_shards"
+CACHE_COLLECTION = "leaderboard_cache"
+CACHE_DOC_ID = "current"
+NUM_SHARDS = 10
+
+
+def get_stats_doc_id(system_name):
+    # Same slug as getStatsDocId() in js/stats.js
+    return "-".join(system_name.lower().split())
+
+
+class FakeFirestore:
+    """
+    In-process stand-in for the handful of Firestore operations used here.
+    Each document has its own lock and an optional write latency, so that
+    concurrent writes to the same document serialize the way they do on a
+    real Firestore document.
+    """
+
+    def __init__(self, write_latency=0.0):
+        self.write_latency = write_latency
+        self.retries = 0
+        self._collections = {}
+        self._versions = {}
+        self._doc_locks = {}
+        self._lock = threading.Lock()
+
+    def _doc_lock(self, collection, doc_id):
+        with self._lock:
+            key = (collection, doc_id)
+            if key not in self._doc_locks:
+                self._doc_locks[key] = threading.Lock()
+            return self._doc_locks[key]
+
+    def increment(self, collection, doc_id, fields, amount=1):
+        with self._doc_lock(collection, doc_id):
+            docs = self._collections.setdefault(collection, {})
+            doc = dict(docs.get(doc_id, {}))
+            doc.update(fields)
+            doc["count"] = doc.get("count", 0) + amount
+            if self.write_latency:
+                time.sleep(self.write_latency)
+            docs[doc_id] = doc
+            self._bump_version(collection, doc_id)
+
+    def _bump_version(self, collection, doc_id):
+        key = (collection, doc_id)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def transactional_increment(self, collection, doc_id, fields):
+        """
+        Read-modify-write with optimistic concurrency, like a client-side
+        Firestore transaction: the commit fails and the transaction retries
+        if another writer changed the document after it was read.
+        """
+        key = (collection, doc_id)
+        while True:
+            with self._doc_lock(collection, doc_id):
+                version = self._versions.get(key, 0)
+                doc = dict(self._collections.get(collection, {}).get(doc_id, {}))
+
+            # Round trip between the read and the commit
+            if self.write_latency:
+                time.sleep(self.write_latency)
+
+            with self._doc_lock(collection, doc_id):
+                if self._versions.get(key, 0) == version:
+                    doc.update(fields)
+                    doc["count"] = doc.get("count", 0) + 1
+                    self._collections.setdefault(collection, {})[doc_id] = doc
+                    self._bump_version(collection, doc_id)
+                    return
+            with self._lock:
+                self.retries += 1
+
+    def set(self, collection, doc_id, data):
+        with self._doc_lock(collection, doc_id):
+            self._collections.setdefault(collection, {})[doc_id] = dict(data)
+
+    def stream(self, collection):
+        with self._lock:
+            docs = dict(self._collections.get(collection, {}))
+        return [(doc_id, dict(data)) for doc_id, data in docs.items()]
+
+
+class FirestoreBackend:
+    """
+    Thin wrapper around google-cloud-firestore exposing the same interface as
+    FakeFirestore. Honors FIRESTORE_EMULATOR_HOST for local testing.
+    """
+
+    def __init__(self, project=None):
+        try:
+            from google.cloud import firestore
+        except ImportError:
+            print(
+                "Error: google-cloud-firestore is required (pip install google-cloud-firestore)."
+            )
+            sys.exit(1)
+
+        self._firestore = firestore
+        self.client = firestore.Client(project=project)
+
+    def increment(self, collection, doc_id, fields, amount=1):
+        data = dict(fields)
+        data["count"] = self._firestore.Increment(amount)
+        self.client.collection(collection).document(doc_id).set(data, merge=True)
+
+    def transactional_increment(self, collection, doc_id, fields):
+        doc_ref = self.client.collection(collection).document(doc_id)
+
+        @self._firestore.transactional
+        def update(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                transaction.set(doc_ref, {**fields, "count": 1})
+            else:
+                transaction.update(doc_ref, {"count": (snapshot.get("count") or 0) + 1})
+
+        update(self.client.transaction())
+
+    def set(self, collection, doc_id, data):
+        self.client.collection(collection).document(doc_id).set(data)
+
+    def stream(self, collection):
+        return [
+            (doc.id, doc.to_dict()) for doc in self.client.collection(collection).stream()
+        ]
+
+
+def increment_system_count(db, system_name, num_shards=NUM_SHARDS):
+    """
+    Python equivalent of incrementSystemCount() in js/stats.js.
+    """
+    doc_id = get_stats_doc_id(system_name)
+    shard = random.randrange(num_shards)
+    db.increment(
+        SHARDS_COLLECTION,
+        f"{doc_id}_{shard}",
+        {"system": doc_id, "name": system_name, "shard": shard},
+    )
+
+
+def increment_system_count_transactional(db, system_name):
+    """
+    The previous incrementSystemCount(): a read-modify-write transaction on
+    one system_stats document per system. Kept as the load test baseline.
+    """
+    db.transactional_increment(
+        LEGACY_COLLECTION, get_stats_doc_id(system_name), {"name": system_name}
+    )
+
+
+def aggregate_counts(db):
+    """
+    Sum legacy counters and all shards into a mapping of system name -> count.
+    """
+    counts = {}
+    names = {}
+
+    for doc_id, data in db.stream(LEGACY_COLLECTION):
+        names[doc_id] = data.get("name") or names.get(doc_id) or doc_id
+        counts[doc_id] = counts.get(doc_id, 0) + data.get("count", 0)
+
+    for doc_id, data in db.stream(SHARDS_COLLECTION):
+        system_id = data.get("system") or doc_id.rsplit("_", 1)[0]
+        names[system_id] = data.get("name") or names.get(system_id) or system_id
+        counts[system_id] = counts.get(system_id, 0) + data.get("count", 0)
+
+    return {names[system_id]: count for system_id, count in counts.items()}
+
+
+def build_snapshot(counts):
+    return {
+        "counts": counts,
+        "total": sum(counts.values()),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def run_load_test(db, system_names, increments, workers, increment):
+    """
+    Fire increments from concurrent workers and report throughput.
+    `increment(db, system_name)` performs one write. Counts are compared
+    before and after, so existing data (e.g. in the emulator) doesn't matter.
+    Returns (increments per second, failed increments).
+    """
+    # Spread the remainder over the first workers so every increment runs
+    per_worker = [
+        increments // workers + (1 if i < increments % workers else 0)
+        for i in range(workers)
+    ]
+    failures = []
+
+    def worker(count):
+        for _ in range(count):
+            try:
+                increment(db, random.choice(system_names))
+            except Exception as e:
+                failures.append(e)
+
+    before = sum(aggregate_counts(db).values())
+    threads = [threading.Thread(target=worker, args=(n,)) for n in per_worker]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    added = sum(aggregate_counts(db).values()) - before
+    expected = increments - len(failures)
+    if added != expected:
+        print(f"  Mismatch: aggregated {added} new counts, expected {expected}")
+
+    rate = expected / elapsed if elapsed > 0 else float("inf")
+    return rate, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aggregate sharded system stats into a cached leaderboard snapshot"
+    )
+    parser.add_argument("--project", default=None, help="Firebase project ID")
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use an in-process fake Firestore instead of a real/emulated one",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Also write the snapshot to this JSON file (relative to data/)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the snapshot without writing it to Firestore",
+    )
+    parser.add_argument(
+        "--load-test",
+        action="store_true",
+        help="Run a concurrent increment load test instead of aggregating",
+    )
+    parser.add_argument(
+        "--increments", type=int, default=2000, help="Total increments for load test"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Concurrent workers for load test"
+    )
+    parser.add_argument(
+        "--systems",
+        type=int,
+        default=1,
+        help="Number of systems receiving load test traffic (1 = single hot system)",
+    )
+    parser.add_argument(
+        "--write-latency",
+        type=float,
+        default=0.002,
+        help="Simulated per-document write latency in seconds (fake only)",
+    )
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(base_dir), "data")
+
+    def make_db():
+        if args.fake:
+            return FakeFirestore(write_latency=args.write_latency)
+        return FirestoreBackend(project=args.project)
+
+    if args.load_test:
+        if args.increments < 1 or args.workers < 1:
+            print("Error: --increments and --workers must be positive.")
+            sys.exit(1)
+        if not args.fake and not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+            print("Error: --load-test requires --fake or FIRESTORE_EMULATOR_HOST.")
+            sys.exit(1)
+
+        with open(os.path.join(data_dir, "systems.json"), "r") as f:
+            system_names = [s["name"] for s in json.load(f)][: max(args.systems, 1)]
+
+        print(
+            f"Load test: {args.increments} increments, {args.workers} workers, "
+            f"{len(system_names)} systems"
+        )
+        passes = [
+            ("transaction (previous code)", increment_system_count_transactional),
+            ("1 shard, atomic increment", lambda db, name: increment_system_count(db, name, 1)),
+            (f"{NUM_SHARDS} shards, atomic increment", increment_system_count),
+        ]
+        for label, increment in passes:
+            db = make_db()
+            rate, failed = run_load_test(
+                db, system_names, args.increments, args.workers, increment
+            )
+            line = f"  {label:<28} {rate:>8,.0f} increments/sec"
+            if failed:
+                line += f", {failed} failed"
+            if getattr(db, "retries", 0):
+                line += f", {db.retries} transaction retries"
+            print(line)
+        return
+
+    db = make_db()
+    snapshot = build_snapshot(aggregate_counts(db))
+
+    if args.dry_run:
+        print(json.dumps(snapshot, indent=2))
+    else:
+        db.set(CACHE_COLLECTION, CACHE_DOC_ID, snapshot)
+        print(
+            f"Wrote {CACHE_COLLECTION}/{CACHE_DOC_ID}: "
+            f"{len(snapshot['counts'])} systems, {snapshot['total']} total matches"
+        )
+
+    if args.output:
+        output_path = os.path.join(data_dir, args.output)
+        with open(output_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        print(f"Snapshot saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from scipy.cluster.hierarchy import fcluster, leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+from quiz_llm import load_json
+
+
+def collect_system_names(results, systems):
+    """
+    Systems scored in every result, in systems.json order.
+    Returns (included, excluded); excluded systems are missing from at least
+    one result (e.g. older batches run before the system was added).
+    """
+    common = set.intersection(*(set(r["per_system_runs"]) for r in results))
+    included = [s["name"] for s in systems if s["name"] in common]
+    scored = set.union(*(set(r["per_system_runs"]) for r in results))
+    excluded = [s["name"] for s in systems if s["name"] in scored - common]
+    return included, excluded
+
+
+def build_run_matrix(results, system_names):
+    """
+    Stack every run of every model into one (runs x systems) matrix.
+    Results for the same model (e.g. from appended batches) are merged.
+    Returns (model_names, run_model, X) where run_model[i] is the model index
+    of row i of X.
+    """
+    model_names = []
+    model_index = {}
+    blocks = []
+    run_model = []
+
+    for result in results:
+        name = result["model"]
+        if name not in model_index:
+            model_index[name] = len(model_names)
+            model_names.append(name)
+        columns = [result["per_system_runs"][s] for s in system_names]
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"{name}: per_system_runs lists have different lengths "
+                f"({min(lengths)} to {max(lengths)} runs); every system must "
+                "have one score per run."
+            )
+        # (systems x runs) -> (runs x systems)
+        block = np.array(columns, dtype=np.float64).T
+        blocks.append(block)
+        run_model.append(np.full(block.shape[0], model_index[name]))
+
+    return model_names, np.concatenate(run_model), np.vstack(blocks)
+
+
+def pairwise_sq_distances(A, B):
+    """
+    Squared Euclidean distances between rows of A and rows of B.
+    """
+    sq = (
+        np.einsum("ij,ij->i", A, A)[:, None]
+        + np.einsum("ij,ij->i", B, B)[None, :]
+        - 2.0 * A @ B.T
+    )
+    return np.maximum(sq, 0.0)
+
+
+def model_statistics(X, run_model, n_models):
+    """
+    Model-to-model distances and within-model spread from the run matrix.
+
+    The distance between models A and B is the root mean squared Euclidean
+    distance over all pairs of their runs. Since
+        mean ||a - b||^2 = mean ||a||^2 + mean ||b||^2 - 2 mu_A . mu_B,
+    this only needs per-model means, so it never builds the run-to-run matrix.
+    The diagonal (excluding self-pairs) is the within-model spread.
+    """
+    counts = np.bincount(run_model, minlength=n_models).astype(np.float64)
+
+    centroids = np.zeros((n_models, X.shape[1]))
+    np.add.at(centroids, run_model, X)
+    centroids /= counts[:, None]
+    mean_sq_norms = (
+        np.bincount(run_model, weights=np.einsum("ij,ij->i", X, X), minlength=n_models)
+        / counts
+    )
+
+    mean_sq = (
+        mean_sq_norms[:, None] + mean_sq_norms[None, :] - 2.0 * centroids @ centroids.T
+    )
+    mean_sq = np.maximum(mean_sq, 0.0)
+
+    # Within-model: self-pairs contribute zero, so rescale by n / (n - 1)
+    within = np.diag(mean_sq) * np.where(counts > 1, counts / np.maximum(counts - 1, 1), 0)
+    distances = np.sqrt(mean_sq)
+    np.fill_diagonal(distances, 0.0)
+
+    return centroids, distances, np.sqrt(within), counts.astype(int)
+
+
+def cluster_models(distances, centroids, method, n_clusters):
+    """
+    Hierarchical clustering of models from their distance matrix.
+    Ward linkage needs Euclidean distances between points, which the RMS
+    distances are not (they include within-model spread), so it clusters the
+    model centroids instead.
+    """
+    if distances.shape[0] < 2:
+        return None
+
+    if method == "ward":
+        Z = linkage(centroids, method="ward")
+    else:
+        Z = linkage(squareform(distances, checks=False), method=method)
+    clustering = {
+        "method": method,
+        "input": "centroids" if method == "ward" else "model_distances",
+        "linkage": np.round(Z, 3).tolist(),
+        "order": leaves_list(Z).tolist(),
+    }
+    if n_clusters:
+        clustering["clusters"] = (
+            fcluster(Z, t=n_clusters, criterion="maxclust") - 1
+        ).tolist()
+    return clustering
+
+
+def analyze(results, systems, method="average", n_clusters=None):
+    """
+    Returns (report, run_model, X) so callers can build the optional
+    run-to-run matrix from the same stacked runs.
+    """
+    system_names, excluded = collect_system_names(results, systems)
+    model_names, run_model, X = build_run_matrix(results, system_names)
+    centroids, distances, spread, counts = model_statistics(X, run_model, len(model_names))
+
+    report = {
+        "systems": system_names,
+        "excluded_systems": excluded,
+        "metric": "rms_euclidean",
+        "models": [
+            {
+                "model": name,
+                "runs": int(counts[i]),
+                "spread": round(float(spread[i]), 2),
+                "mean_scores": np.round(centroids[i], 1).tolist(),
+            }
+            for i, name in enumerate(model_names)
+        ],
+        "model_distances": np.round(distances, 2).tolist(),
+        "clustering": cluster_models(distances, centroids, method, n_clusters),
+    }
+    return report, run_model, X
+
+
+def run_distance_matrix(X, run_model):
+    return {
+        "model_index": run_model.tolist(),
+        "distances": np.round(np.sqrt(pairwise_sq_distances(X, X)), 2).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cross-model similarity and clustering report from per-run scores"
+    )
+    parser.add_argument(
+        "--input", default="batch_results.json", help="Batch results JSON (in data/)"
+    )
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="Read from this SQLite results store (in data/) instead of --input",
+    )
+    parser.add_argument(
+        "--output", default="model_similarity.json", help="Output JSON file (in data/)"
+    )
+    parser.add_argument(
+        "--method",
+        choices=["average", "complete", "single", "ward"],
+        default="average",
+        help="Hierarchical clustering linkage method",
+    )
+    parser.add_argument(
+        "--clusters", type=int, default=None, help="Also assign N flat clusters"
+    )
+    parser.add_argument(
+        "--runs-output",
+        default=None,
+        help="Also write the run-to-run distance matrix to this JSON file (in data/)",
+    )
+    parser.add_argument(
+        "--max-run-matrix",
+        type=int,
+        default=500,
+        help="Skip --runs-output above this many runs (the matrix grows quadratically)",
+    )
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(script_dir), "data")
+
+    systems = load_json(os.path.join(data_dir, "systems.json"))
+    if args.db:
+        import results_store
+
+        conn = results_store.connect(os.path.join(data_dir, args.db))
+        results = results_store.export_results(conn)
+        conn.close()
+    else:
+        results = load_json(os.path.join(data_dir, args.input))
+
+    results = [r for r in results if r.get("per_system_runs")]
+    if not results:
+        print("Error: no per-run scores found.")
+        sys.exit(1)
+
+    try:
+        report, run_model, X = analyze(
+            results, systems, method=args.method, n_clusters=args.clusters
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if report["excluded_systems"]:
+        print(
+            f"Excluded {len(report['excluded_systems'])} system(s) not scored in "
+            f"every result: {', '.join(report['excluded_systems'])}"
+        )
+
+    output_path = os.path.join(data_dir, args.output)
+    with open(output_path, "w") as f:
+        json.dump(report, f, separators=(",", ":"))
+
+    print(
+        f"Analyzed {len(report['models'])} models, {len(report['systems'])} systems. "
+        f"Saved to {output_path}"
+    )
+
+    if args.runs_output:
+        if X.shape[0] > args.max_run_matrix:
+            print(
+                f"Skipping run-to-run matrix: {X.shape[0]} runs exceeds "
+                f"--max-run-matrix {args.max_run_matrix}."
+            )
+        else:
+            runs_path = os.path.join(data_dir, args.runs_output)
+            with open(runs_path, "w") as f:
+                json.dump(run_distance_matrix(X, run_model), f, separators=(",", ":"))
+            print(f"Run-to-run distances ({X.shape[0]} runs) saved to {runs_path}")
+    for model in sorted(report["models"], key=lambda m: m["spread"]):
+        print(f"  {model['model']}: within-model spread {model['spread']}")
+
+
+if __name__ == "__main__":
+    main()
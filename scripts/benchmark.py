@@ -0,0 +1,445 @@
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+import quiz_llm
+
+# Words used to build synthetic option values and labels
+WORDS = [
+    "Physical", "Mental", "Dual", "Neutral", "Process", "Substance", "Void",
+    "Emergent", "Eternal", "Cyclic", "Linear", "Open", "Closed", "Divine",
+    "Immanent", "Transcendent", "Plural", "Monist", "Holistic", "Atomic",
+]
+
+
+def make_dimensions(n_dims, rng):
+    """
+    Synthetic dimensions shaped like data/dimensions.json (4 options each,
+    matching the tetralemma encoding).
+    """
+    dimensions = []
+    for d in range(n_dims):
+        options = []
+        for o in range(len(quiz_llm.TETRALEMMA_VECTORS)):
+            value = f"{rng.choice(WORDS)} {rng.choice(WORDS)}-{d}.{o}"
+            options.append(
+                {"value": value, "label": f"{value} is the nature of dimension {d}."}
+            )
+        dimensions.append(
+            {
+                "id": f"dim_{d}",
+                "label": f"Dimension {d}",
+                "question": f"Question {d}?",
+                "options": options,
+            }
+        )
+    return dimensions
+
+
+def make_systems(n_systems, dimensions, rng):
+    return [
+        {
+            "name": f"System {s}",
+            "description": f"Synthetic system {s}.",
+            "profile": {
+                dim["id"]: rng.choice(dim["options"])["value"] for dim in dimensions
+            },
+        }
+        for s in range(n_systems)
+    ]
+
+
+def mangle_value(value, rng):
+    """
+    Vary case, spacing and punctuation the way model outputs do.
+    """
+    choice = rng.randrange(4)
+    if choice == 0:
+        return value.lower()
+    if choice == 1:
+        return value.upper().replace(" ", "_")
+    if choice == 2:
+        return f" {value.replace('-', ' ')} "
+    return value
+
+
+def make_answer_sets(n_sets, dimensions, rng, missing_rate=0.05):
+    answer_sets = []
+    for _ in range(n_sets):
+        answers = {}
+        for dim in dimensions:
+            if rng.random() < missing_rate:
+                continue
+            answers[dim["id"]] = mangle_value(rng.choice(dim["options"])["value"], rng)
+        answer_sets.append(answers)
+    return answer_sets
+
+
+def make_messy_outputs(n_outputs, dimensions, rng):
+    """
+    Raw model responses: code fences, "value: label" answers, single-element
+    lists and stray whitespace.
+    """
+    outputs = []
+    for _ in range(n_outputs):
+        answers = {}
+        for dim in dimensions:
+            option = rng.choice(dim["options"])
+            style = rng.randrange(4)
+            if style == 0:
+                answers[dim["id"]] = f"{option['value']}: {option['label']}"
+            elif style == 1:
+                answers[dim["id"]] = [option["value"]]
+            elif style == 2:
+                answers[dim["id"]] = [f"{option['value']}: {option['label']}"]
+            else:
+                answers[dim["id"]] = mangle_value(option["value"], rng)
+
+        content = json.dumps(answers, indent=rng.choice([None, 2]))
+        fence = rng.randrange(3)
+        if fence == 0:
+            content = f"```json\n{content}\n```"
+        elif fence == 1:
+            content = f"```\n{content}```"
+        outputs.append(f"\n  {content}  \n")
+    return outputs
+
+
+def reference_workload():
+    """
+    Fixed pure-Python loop timed next to every benchmark. Comparing
+    throughput relative to it cancels out CPU speed drift (frequency
+    scaling, noisy neighbours) between the baseline and the current run.
+    """
+    total = 0
+    for i in range(20000):
+        total += len(str(i)) * (i % 7)
+    return total
+
+
+def best_time(func, repeat):
+    """
+    Best-of-`repeat` wall time for one call of func, in seconds.
+    Each sample loops func enough times to last at least 0.2 s (as chosen by
+    timeit's autorange), so short calls aren't dominated by timer noise.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def time_call(func, count, unit, repeat):
+    """
+    Time func (which processes `count` items) and the reference workload
+    right before and after it.
+    """
+    before = best_time(reference_workload, 3)
+    seconds = best_time(func, repeat)
+    after = best_time(reference_workload, 3)
+    return {
+        "seconds": seconds,
+        "throughput": count / seconds,
+        "unit": unit,
+        "reference_seconds": (before + after) / 2,
+    }
+
+
+def relative_throughput(result):
+    """
+    Items processed per run of the reference workload.
+    """
+    return result["throughput"] * result["reference_seconds"]
+
+
+def bench_scoring(sizes, repeat, seed):
+    """
+    sizes is a list of (n_systems, n_dims, n_answer_sets).
+    """
+    results = {}
+    for n_systems, n_dims, n_answer_sets in sizes:
+        rng = random.Random(seed)
+        dimensions = make_dimensions(n_dims, rng)
+        systems = make_systems(n_systems, dimensions, rng)
+        answer_sets = make_answer_sets(n_answer_sets, dimensions, rng)
+
+        def run():
+            for answers in answer_sets:
+                quiz_llm.calculate_score(answers, systems, dimensions)
+
+        results[f"score/{n_systems}x{n_dims}/{n_answer_sets}"] = time_call(
+            run, n_answer_sets, "answer_sets/s", repeat
+        )
+    return results
+
+
+def bench_parsing(n_outputs, dim_counts, repeat, seed):
+    results = {}
+    for n_dims in dim_counts:
+        results.update(bench_parsing_dims(n_outputs, n_dims, repeat, seed))
+    return results
+
+
+def bench_parsing_dims(n_outputs, n_dims, repeat, seed):
+    rng = random.Random(seed)
+    dimensions = make_dimensions(n_dims, rng)
+    outputs = make_messy_outputs(n_outputs, dimensions, rng)
+    parsed = [
+        json.loads(quiz_llm.clean_json_content(content)) for content in outputs
+    ]
+    strings = [
+        mangle_value(option["value"], rng)
+        for dim in dimensions
+        for option in dim["options"]
+    ] * max(1, n_outputs // 10)
+
+    def run_clean_json():
+        for content in outputs:
+            json.loads(quiz_llm.clean_json_content(content))
+
+    def run_clean_answers():
+        for answers in parsed:
+            quiz_llm.clean_answer_values(answers)
+
+    def run_normalize():
+        for s in strings:
+            quiz_llm.normalize_string(s)
+
+    results = {}
+    for name, func, count, unit in [
+        ("clean_json_content", run_clean_json, len(outputs), "outputs/s"),
+        ("clean_answer_values", run_clean_answers, len(parsed), "outputs/s"),
+        ("normalize_string", run_normalize, len(strings), "strings/s"),
+    ]:
+        results[f"parse/{name}/{n_dims}d"] = time_call(func, count, unit, repeat)
+    return results
+
+
+def bench_map(system_counts, n_dims, mds_init, repeat, seed):
+    try:
+        from sklearn.metrics.pairwise import pairwise_distances
+        import generate_map
+    except ImportError as e:
+        print(f"Skipping map benchmarks ({e}).")
+        return {}
+
+    results = {}
+    for n_systems in system_counts:
+        rng = random.Random(seed)
+        dimensions = make_dimensions(n_dims, rng)
+        systems = make_systems(n_systems, dimensions, rng)
+        distance_matrix = pairwise_distances(
+            generate_map.encode_systems(systems, dimensions), metric="euclidean"
+        )
+        # t-SNE requires perplexity < n_samples
+        perplexity = min(10.0, (n_systems - 1) / 3)
+
+        for algo in ("mds", "tsne"):
+            results[f"map/{algo}/{n_systems}"] = time_call(
+                lambda: generate_map.compute_embedding(
+                    distance_matrix, algo, perplexity, n_init=mds_init
+                ),
+                n_systems,
+                "systems/s",
+                repeat,
+            )
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    Return (name, baseline_throughput, current_throughput, slowdown) for every
+    benchmark slower than the baseline by more than `threshold`, measured
+    relative to the reference workload.
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["throughput"]
+        slowdown = relative_throughput(baseline[name]) / relative_throughput(result) - 1
+        if slowdown > threshold:
+            regressions.append((name, base, result["throughput"], slowdown))
+    return regressions
+
+
+def missing_benchmarks(current, baseline, groups):
+    """
+    Baseline benchmarks in the selected groups that did not run this time
+    (e.g. map benchmarks skipped because scikit-learn is missing).
+    """
+    return [
+        name
+        for name in baseline
+        if name.split("/", 1)[0] in groups and name not in current
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark scoring, response parsing and map generation"
+    )
+    parser.add_argument(
+        "--baseline",
+        default="benchmark_baseline.json",
+        help="Baseline JSON file (relative to scripts/)",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Write results to the baseline file"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare against the baseline and fail on regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--only",
+        choices=["score", "parse", "map"],
+        action="append",
+        help="Run only these benchmark groups (repeatable)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smaller sizes for a fast smoke run"
+    )
+    parser.add_argument(
+        "--mds-init",
+        type=int,
+        default=4,
+        help="MDS restarts per map benchmark (generate_map.py uses 100)",
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="Best-of repetitions")
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Re-run groups with possible regressions this many times before failing",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    baseline_path = os.path.join(base_dir, args.baseline)
+    groups = args.only or ["score", "parse", "map"]
+
+    if args.quick:
+        score_sizes = [(40, 8, 20), (40, 8, 200), (200, 16, 20)]
+        parse_dims, n_outputs = [8, 32], 2000
+        map_counts = [40, 100]
+    else:
+        score_sizes = [
+            (40, 8, 20),
+            (40, 8, 200),
+            (40, 8, 2000),
+            (200, 16, 20),
+            (1000, 32, 20),
+        ]
+        parse_dims, n_outputs = [8, 32, 128], 5000
+        map_counts = [40, 100, 200, 400]
+
+    def run_groups(run):
+        results = {}
+        if "score" in run:
+            print("Running scoring benchmarks...")
+            results.update(bench_scoring(score_sizes, args.repeat, args.seed))
+        if "parse" in run:
+            print("Running parsing benchmarks...")
+            results.update(bench_parsing(n_outputs, parse_dims, args.repeat, args.seed))
+        if "map" in run:
+            print("Running map benchmarks...")
+            results.update(
+                bench_map(map_counts, 8, args.mds_init, args.repeat, args.seed)
+            )
+        return results
+
+    results = run_groups(groups)
+
+    print()
+    for name, result in results.items():
+        print(
+            f"  {name:<36} {result['seconds'] * 1000:>10.2f} ms"
+            f"  {result['throughput']:>12,.0f} {result['unit']}"
+        )
+
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"Error: {baseline_path} not found. Run with --save first.")
+            sys.exit(1)
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+
+        # Timings are only comparable when the workloads match
+        for key in ("quick", "seed", "mds_init"):
+            if baseline.get(key) != getattr(args, key):
+                print(
+                    f"Error: baseline was recorded with {key}={baseline.get(key)}, "
+                    f"current run uses {key}={getattr(args, key)}."
+                )
+                sys.exit(1)
+        baseline = baseline["results"]
+
+        failed = False
+        missing = missing_benchmarks(results, baseline, groups)
+        if missing:
+            failed = True
+            print(f"\n{len(missing)} baseline benchmark(s) did not run:")
+            for name in missing:
+                print(f"  {name}")
+
+        regressions = compare(results, baseline, args.threshold)
+        for attempt in range(args.retries):
+            if not regressions:
+                break
+            # Re-run the affected groups and keep each benchmark's best
+            # throughput: a real regression stays slow, timer noise doesn't
+            print(f"\nRe-checking {len(regressions)} possible regression(s)...")
+            rerun = run_groups({name.split("/", 1)[0] for name, *_ in regressions})
+            for name, result in rerun.items():
+                if relative_throughput(result) > relative_throughput(results[name]):
+                    results[name] = result
+            regressions = compare(results, baseline, args.threshold)
+
+        if regressions:
+            failed = True
+            print(f"\n{len(regressions)} benchmark(s) regressed past {args.threshold:.0%}:")
+            for name, base, current, slowdown in regressions:
+                unit = results[name]["unit"]
+                print(
+                    f"  {name}: {base:,.0f} -> {current:,.0f} {unit} ({slowdown:.0%} slower vs. reference)"
+                )
+
+        if failed:
+            sys.exit(1)
+        print(f"\nNo regressions past {args.threshold:.0%}.")
+
+    if args.save:
+        config = {"quick": args.quick, "seed": args.seed, "mds_init": args.mds_init}
+        saved = {**config, "groups": [], "results": {}}
+
+        # Merge into an existing baseline recorded with the same workload, so
+        # saving one group keeps the other groups' results
+        if os.path.exists(baseline_path):
+            with open(baseline_path, "r") as f:
+                existing = json.load(f)
+            if all(existing.get(key) == value for key, value in config.items()):
+                saved["groups"] = existing.get("groups", [])
+                saved["results"] = existing.get("results", {})
+            else:
+                print("Existing baseline used different settings; replacing it.")
+
+        saved["groups"] = sorted(set(saved["groups"]) | set(groups))
+        saved["results"].update(results)
+        with open(baseline_path, "w") as f:
+            json.dump(saved, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path} (groups: {', '.join(saved['groups'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,78 @@ from quiz_llm import load_json
 TETRALEMMA_VECTORS = [[1, 0], [0, 1], [1, 1], [0, 0]]
 
 
+def encode_systems(systems, dimensions, encoding="tetralemma"):
+    """
+    Encode system profiles as numeric vectors (tetralemma or one-hot).
+    """
+    if encoding == "tetralemma":
+        encoded_data = []
+
+        for system in systems:
+            system_vector = []
+            for dim in dimensions:
+                dim_id = dim["id"]
+                system_val = system["profile"].get(dim_id, "")
+
+                # Find matching option and get its tetralemma vector
+                vector = [0, 0]  # Default if not found
+                for i, option in enumerate(dim["options"]):
+                    if option["value"] == system_val:
+                        vector = TETRALEMMA_VECTORS[i]
+                        break
+
+                system_vector.extend(vector)
+            encoded_data.append(system_vector)
+
+        return np.array(encoded_data)
+
+    # Extract dimension keys
+    dim_keys = [d["id"] for d in dimensions]
+
+    # Prepare data for encoding
+    data = []
+    for system in systems:
+        row = []
+        for key in dim_keys:
+            # Get the value for this dimension
+            val = system["profile"].get(key, "")
+            row.append(val)
+        data.append(row)
+
+    encoder = OneHotEncoder(sparse_output=False)
+    return encoder.fit_transform(data)
+
+
+def compute_embedding(distance_matrix, algo="mds", perplexity=10.0, n_init=100):
+    """
+    Project a precomputed distance matrix to 2D.
+    Returns (coords, fitted_model).
+    """
+    if algo == "mds":
+        # n_init=100 runs the algorithm 100 times and picks the best result automatically
+        mds = MDS(
+            n_components=2,
+            dissimilarity="precomputed",
+            random_state=42,
+            normalized_stress="auto",
+            n_init=n_init,
+            max_iter=1000,
+        )
+        return mds.fit_transform(distance_matrix), mds
+
+    # t-SNE for distance matrix requires metric='precomputed'
+    # init='random' is usually safer for small datasets with precomputed distances than 'pca'
+    tsne = TSNE(
+        n_components=2,
+        metric="precomputed",
+        init="random",
+        random_state=42,
+        perplexity=perplexity,
+        max_iter=2000,
+    )
+    return tsne.fit_transform(distance_matrix), tsne
+
+
 def main():
     # Parse arguments
     parser = argparse.ArgumentParser(
@@ -50,81 +122,25 @@ def main():
         print("Error: systems.json or dimensions.json not found.")
         return
 
-    # Extract dimension keys
-    dim_keys = [d["id"] for d in dimensions]
-
-    # Prepare data for encoding
-    data = []
-    system_names = []
-
-    for system in systems:
-        system_names.append(system["name"])
-        row = []
-        for key in dim_keys:
-            # Get the value for this dimension
-            val = system["profile"].get(key, "")
-            row.append(val)
-        data.append(row)
-
     # Encode the categorical data
     if args.encoding == "tetralemma":
         print("Using Tetralemma Encoding...")
-        encoded_data = []
-
-        for system in systems:
-            system_vector = []
-            for dim in dimensions:
-                dim_id = dim["id"]
-                system_val = system["profile"].get(dim_id, "")
-
-                # Find matching option and get its tetralemma vector
-                vector = [0, 0]  # Default if not found
-                for i, option in enumerate(dim["options"]):
-                    if option["value"] == system_val:
-                        vector = TETRALEMMA_VECTORS[i]
-                        break
-
-                system_vector.extend(vector)
-            encoded_data.append(system_vector)
-
-        encoded_data = np.array(encoded_data)
-
     else:
         print("Using One-Hot Encoding...")
-        encoder = OneHotEncoder(sparse_output=False)
-        encoded_data = encoder.fit_transform(data)
+    encoded_data = encode_systems(systems, dimensions, args.encoding)
 
     # Compute distance matrix (using Euclidean distance on one-hot vectors)
     distance_matrix = pairwise_distances(encoded_data, metric="euclidean")
 
     if args.algo == "mds":
         print("Running MDS...")
-        # n_init=100 runs the algorithm 100 times and picks the best result automatically
-        mds = MDS(
-            n_components=2,
-            dissimilarity="precomputed",
-            random_state=42,
-            normalized_stress="auto",
-            n_init=100,
-            max_iter=1000,
-        )
-        coords = mds.fit_transform(distance_matrix)
-        print(f"MDS Stress: {mds.stress_:.4f}")
-
     elif args.algo == "tsne":
         print(f"Running t-SNE (perplexity={args.perplexity})...")
-        # t-SNE for distance matrix requires metric='precomputed'
-        # init='random' is usually safer for small datasets with precomputed distances than 'pca'
-        tsne = TSNE(
-            n_components=2,
-            metric="precomputed",
-            init="random",
-            random_state=42,
-            perplexity=args.perplexity,
-            max_iter=2000,
-        )
-        coords = tsne.fit_transform(distance_matrix)
-        print(f"t-SNE KL Divergence: {tsne.kl_divergence_:.4f}")
+    coords, model = compute_embedding(distance_matrix, args.algo, args.perplexity)
+    if args.algo == "mds":
+        print(f"MDS Stress: {model.stress_:.4f}")
+    elif args.algo == "tsne":
+        print(f"t-SNE KL Divergence: {model.kl_divergence_:.4f}")
 
     # Normalize coordinates to be roughly within -100 to 100 range for easier plotting
     # Find min/max
@@ -0,0 +1,415 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    runs_per_model INTEGER,
+    sequential INTEGER NOT NULL DEFAULT 0,
+    append INTEGER NOT NULL DEFAULT 0,
+    source TEXT,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_batches_created_at ON batches (created_at);
+
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS model_results (
+    id INTEGER PRIMARY KEY,
+    batch_id INTEGER NOT NULL REFERENCES batches (id),
+    model_id INTEGER NOT NULL REFERENCES models (id),
+    runs INTEGER NOT NULL,
+    stated_commitment TEXT,
+    stated_commitment_distribution TEXT NOT NULL,
+    stated_explanations TEXT NOT NULL,
+    top_match TEXT,
+    runner_up TEXT,
+    worst_match TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_model_results_batch ON model_results (batch_id);
+CREATE INDEX IF NOT EXISTS idx_model_results_model ON model_results (model_id);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    model_result_id INTEGER NOT NULL REFERENCES model_results (id),
+    batch_id INTEGER NOT NULL REFERENCES batches (id),
+    model_id INTEGER NOT NULL REFERENCES models (id),
+    run INTEGER NOT NULL,
+    stated_commitment TEXT,
+    stated_explanation TEXT,
+    top_match TEXT,
+    percentage INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model_id);
+CREATE INDEX IF NOT EXISTS idx_runs_batch ON runs (batch_id);
+CREATE INDEX IF NOT EXISTS idx_runs_model_result ON runs (model_result_id);
+
+CREATE TABLE IF NOT EXISTS run_scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    system TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    percentage INTEGER NOT NULL,
+    PRIMARY KEY (run_id, system)
+);
+CREATE INDEX IF NOT EXISTS idx_run_scores_system ON run_scores (system);
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+
+    # Stores created before completed_at existed only hold finished batches
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(batches)")]
+    if "completed_at" not in columns:
+        conn.execute("ALTER TABLE batches ADD COLUMN completed_at TEXT")
+        conn.execute("UPDATE batches SET completed_at = created_at")
+        conn.commit()
+    return conn
+
+
+def default_db_name(output):
+    """
+    Store file for an output JSON, so each output file has its own history.
+    """
+    if output == "batch_results.json":
+        return "results.db"
+    return os.path.splitext(os.path.basename(output))[0] + ".db"
+
+
+def is_empty(conn):
+    return conn.execute("SELECT COUNT(*) FROM batches").fetchone()[0] == 0
+
+
+def create_batch(conn, runs_per_model=None, sequential=False, append=False, source=None):
+    """
+    Register a new batch and return its ID.
+    A non-append batch replaces everything before it in the exported JSON.
+    Nothing is committed until complete_batch().
+    """
+    cur = conn.execute(
+        "INSERT INTO batches (created_at, runs_per_model, sequential, append, source) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            datetime.now(timezone.utc).isoformat(),
+            runs_per_model,
+            int(sequential),
+            int(append),
+            source,
+        ),
+    )
+    return cur.lastrowid
+
+
+def complete_batch(conn, batch_id):
+    """
+    Mark a batch as finished and commit it. Only completed batches are exported.
+    """
+    conn.execute(
+        "UPDATE batches SET completed_at = ? WHERE id = ?",
+        (datetime.now(timezone.utc).isoformat(), batch_id),
+    )
+    conn.commit()
+
+
+def save_batch(conn, results, runs_per_model=None, sequential=False, append=False, source=None):
+    """
+    Store a list of batch_results.json entries as one completed batch,
+    in a single transaction.
+    """
+    batch_id = create_batch(conn, runs_per_model, sequential, append, source)
+    for model_result in results:
+        save_model_result(conn, batch_id, model_result)
+    complete_batch(conn, batch_id)
+    return batch_id
+
+
+def get_model_id(conn, name):
+    conn.execute("INSERT OR IGNORE INTO models (name) VALUES (?)", (name,))
+    return conn.execute("SELECT id FROM models WHERE name = ?", (name,)).fetchone()[0]
+
+
+def save_model_result(conn, batch_id, model_result):
+    """
+    Store one model entry in the batch_results.json shape.
+    per_system_runs[system][i] is the score of run_details[i].
+    """
+    model_id = get_model_id(conn, model_result["model"])
+    cur = conn.execute(
+        "INSERT INTO model_results (batch_id, model_id, runs, stated_commitment, "
+        "stated_commitment_distribution, stated_explanations, top_match, runner_up, "
+        "worst_match) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            batch_id,
+            model_id,
+            model_result["runs"],
+            model_result.get("stated_commitment"),
+            json.dumps(model_result.get("stated_commitment_distribution", {})),
+            json.dumps(model_result.get("stated_explanations", [])),
+            model_result.get("top_match"),
+            model_result.get("runner_up"),
+            model_result.get("worst_match"),
+        ),
+    )
+    model_result_id = cur.lastrowid
+
+    per_system_runs = model_result.get("per_system_runs", {})
+    for i, detail in enumerate(model_result.get("run_details", [])):
+        cur = conn.execute(
+            "INSERT INTO runs (model_result_id, batch_id, model_id, run, "
+            "stated_commitment, stated_explanation, top_match, percentage) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                model_result_id,
+                batch_id,
+                model_id,
+                detail["run"],
+                detail.get("stated_commitment"),
+                detail.get("stated_explanation"),
+                detail.get("top_match"),
+                detail.get("percentage"),
+            ),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO run_scores (run_id, system, position, percentage) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (run_id, system, position, scores[i])
+                for position, (system, scores) in enumerate(per_system_runs.items())
+                if i < len(scores)
+            ],
+        )
+
+    return model_result_id
+
+
+def load_model_result(conn, row):
+    """
+    Rebuild a batch_results.json entry from a model_results row.
+    """
+    run_rows = conn.execute(
+        "SELECT id, run, stated_commitment, stated_explanation, top_match, percentage "
+        "FROM runs WHERE model_result_id = ? ORDER BY id",
+        (row["id"],),
+    ).fetchall()
+
+    per_system_runs = {}
+    for score in conn.execute(
+        "SELECT s.system, s.percentage FROM run_scores s JOIN runs r ON r.id = s.run_id "
+        "WHERE r.model_result_id = ? ORDER BY r.id, s.position",
+        (row["id"],),
+    ):
+        per_system_runs.setdefault(score["system"], []).append(score["percentage"])
+
+    return {
+        "model": row["model"],
+        "runs": row["runs"],
+        "stated_commitment": row["stated_commitment"],
+        "stated_commitment_distribution": json.loads(
+            row["stated_commitment_distribution"]
+        ),
+        "stated_explanations": json.loads(row["stated_explanations"]),
+        "top_match": row["top_match"],
+        "runner_up": row["runner_up"],
+        "worst_match": row["worst_match"],
+        "match_scores": {name: sum(scores) for name, scores in per_system_runs.items()},
+        "per_system_runs": per_system_runs,
+        "run_details": [
+            {
+                "run": r["run"],
+                "stated_commitment": r["stated_commitment"],
+                "stated_explanation": r["stated_explanation"],
+                "top_match": r["top_match"],
+                "percentage": r["percentage"],
+            }
+            for r in run_rows
+        ],
+    }
+
+
+def export_results(conn):
+    """
+    Regenerate the batch_results.json list: the most recent completed
+    non-append batch with results, followed by every completed batch appended
+    after it. Interrupted batches are never exported.
+    """
+    start = conn.execute(
+        "SELECT COALESCE(MAX(b.id), 0) FROM batches b "
+        "WHERE b.append = 0 AND b.completed_at IS NOT NULL "
+        "AND EXISTS (SELECT 1 FROM model_results mr WHERE mr.batch_id = b.id)"
+    ).fetchone()[0]
+    rows = conn.execute(
+        "SELECT mr.*, m.name AS model FROM model_results mr "
+        "JOIN models m ON m.id = mr.model_id JOIN batches b ON b.id = mr.batch_id "
+        "WHERE mr.batch_id >= ? AND b.completed_at IS NOT NULL "
+        "ORDER BY mr.batch_id, mr.id",
+        (start,),
+    )
+    return [load_model_result(conn, row) for row in rows]
+
+
+def write_json(conn, output_path):
+    results = export_results(conn)
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    return len(results)
+
+
+def import_json(conn, input_path):
+    with open(input_path, "r") as f:
+        results = json.load(f)
+    save_batch(conn, results, source=os.path.basename(input_path))
+    return len(results)
+
+
+def print_rows(rows, columns):
+    widths = [len(c) for c in columns]
+    rows = [["" if v is None else str(v) for v in row] for row in rows]
+    for row in rows:
+        widths = [max(w, len(v)) for w, v in zip(widths, row)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def query_models(conn, args):
+    rows = conn.execute(
+        "SELECT m.name, COUNT(DISTINCT mr.batch_id), SUM(mr.runs), "
+        "MAX(b.created_at) FROM model_results mr "
+        "JOIN models m ON m.id = mr.model_id JOIN batches b ON b.id = mr.batch_id "
+        "GROUP BY m.id ORDER BY m.name"
+    )
+    print_rows(rows, ["model", "batches", "runs", "last_batch"])
+
+
+def query_history(conn, args):
+    rows = conn.execute(
+        "SELECT b.id, b.created_at, mr.runs, mr.top_match, mr.runner_up, "
+        "mr.stated_commitment FROM model_results mr "
+        "JOIN models m ON m.id = mr.model_id JOIN batches b ON b.id = mr.batch_id "
+        "WHERE m.name = ? ORDER BY b.created_at, mr.id",
+        (args.model,),
+    )
+    print_rows(
+        rows,
+        ["batch", "created_at", "runs", "top_match", "runner_up", "stated_commitment"],
+    )
+
+
+def query_mismatches(conn, args):
+    sql = (
+        "SELECT m.name, r.batch_id, r.run, r.stated_commitment, r.top_match, "
+        "r.percentage FROM runs r JOIN models m ON m.id = r.model_id "
+        "WHERE r.stated_commitment IS NOT NULL AND r.stated_commitment != r.top_match"
+    )
+    params = []
+    if args.model:
+        sql += " AND m.name = ?"
+        params.append(args.model)
+    sql += " ORDER BY m.name, r.batch_id, r.run"
+    rows = conn.execute(sql, params)
+    print_rows(
+        rows, ["model", "batch", "run", "stated_commitment", "top_match", "percentage"]
+    )
+
+
+def query_system(conn, args):
+    rows = conn.execute(
+        "SELECT m.name, COUNT(*), ROUND(AVG(s.percentage), 1), MIN(s.percentage), "
+        "MAX(s.percentage) FROM run_scores s JOIN runs r ON r.id = s.run_id "
+        "JOIN models m ON m.id = r.model_id WHERE s.system = ? "
+        "GROUP BY m.id ORDER BY AVG(s.percentage) DESC",
+        (args.system,),
+    )
+    print_rows(rows, ["model", "runs", "avg_%", "min_%", "max_%"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and export the LLM results store")
+    parser.add_argument(
+        "--db", default="results.db", help="SQLite results store (relative to data/)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Import an existing batch_results.json as one batch"
+    )
+    import_parser.add_argument("--input", default="batch_results.json")
+    import_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import even if the store already has batches (duplicates runs)",
+    )
+
+    export_parser = subparsers.add_parser(
+        "export", help="Regenerate batch_results.json for the site"
+    )
+    export_parser.add_argument("--output", default="batch_results.json")
+
+    subparsers.add_parser("models", help="List models with batch and run counts")
+
+    history_parser = subparsers.add_parser(
+        "history", help="Top match of one model across batches"
+    )
+    history_parser.add_argument("model")
+
+    mismatch_parser = subparsers.add_parser(
+        "mismatches", help="Runs where stated commitment differs from top match"
+    )
+    mismatch_parser.add_argument("--model", default=None)
+
+    system_parser = subparsers.add_parser(
+        "system", help="Per-model score statistics for one system"
+    )
+    system_parser.add_argument("system")
+
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(os.path.dirname(base_dir), "data")
+    conn = connect(os.path.join(data_dir, args.db))
+
+    try:
+        if args.command == "import":
+            input_path = os.path.join(data_dir, args.input)
+            if not os.path.exists(input_path):
+                print(f"Error: {input_path} not found.")
+                sys.exit(1)
+            if not is_empty(conn) and not args.force:
+                print(
+                    "Error: the results store already has batches; importing again "
+                    "would duplicate runs. Use --force to import anyway."
+                )
+                sys.exit(1)
+            count = import_json(conn, input_path)
+            print(f"Imported {count} model results from {input_path}")
+        elif args.command == "export":
+            output_path = os.path.join(data_dir, args.output)
+            count = write_json(conn, output_path)
+            print(f"Exported {count} model results to {output_path}")
+        elif args.command == "models":
+            query_models(conn, args)
+        elif args.command == "history":
+            query_history(conn, args)
+        elif args.command == "mismatches":
+            query_mismatches(conn, args)
+        elif args.command == "system":
+            query_system(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
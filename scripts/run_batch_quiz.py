@@ -1,9 +1,10 @@
 import argparse
-import json
+import contextlib
 import os
 import sys
 from collections import Counter
 import quiz_llm
+import results_store
 
 
 def load_models(filename):
@@ -32,6 +33,13 @@ def main():
         action="store_true",
         help="Append results to existing output file instead of overwriting",
     )
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="SQLite results store (relative to data/). Defaults to results.db for "
+        "batch_results.json, otherwise <output name>.db, so each output file has "
+        "its own store",
+    )
     parser.add_argument(
         "--sequential",
         action="store_true",
@@ -165,15 +173,21 @@ def main():
 
     # Save results
     output_path = os.path.join(data_dir, args.output)
-
-    if args.append and os.path.exists(output_path):
-        with open(output_path, "r") as f:
-            existing_results = json.load(f)
-        existing_results.extend(results)
-        results = existing_results
-
-    with open(output_path, "w") as f:
-        json.dump(results, f, indent=2)
+    db_path = os.path.join(data_dir, args.db or results_store.default_db_name(args.output))
+
+    # The JSON output is exported from the store, which holds every batch
+    with contextlib.closing(results_store.connect(db_path)) as conn:
+        if results_store.is_empty(conn) and os.path.exists(output_path):
+            # Seed a fresh store with the history already in the output file
+            results_store.import_json(conn, output_path)
+        results_store.save_batch(
+            conn,
+            results,
+            runs_per_model=args.n,
+            sequential=args.sequential,
+            append=args.append,
+        )
+        results_store.write_json(conn, output_path)
 
     print(f"\nBatch execution complete. Results saved to {output_path}")
 